@@ -66,7 +66,7 @@ class AddAnnotationsCommand(VisitorBasedCodemodCommand):
             return None
 
         fqn: QualifiedName = next(iter(fqn_set))  # type: ignore
-        if fqn.name in self.context.scratch[ClassDefVisitor.BASE_MODEL_CONTEXT_KEY]:
+        if ClassDefVisitor.get_classname(fqn) in self.context.scratch[ClassDefVisitor.BASE_MODEL_CONTEXT_KEY]:
             self.inside_base_model = True
             self.base_model_fields = {
                 child for child in node.body.children if isinstance(child, cst.SimpleStatementLine)
@@ -1,14 +1,103 @@
 from __future__ import annotations
 
+from enum import Enum
+from typing import Collection, cast
+
 import libcst as cst
-import libcst.matchers as m
-from libcst.codemod import CodemodContext, VisitorBasedCodemodCommand
+from libcst.codemod import CodemodContext
 from libcst.metadata import FullyQualifiedNameProvider, QualifiedName
+from typing_extensions import TypeGuard
 
+from bump_pydantic.codemods.base import BaseCodemodCommand
 from bump_pydantic.codemods.class_def_visitor import ClassDefVisitor
 
 
-class AddDefaultNoneCommand(VisitorBasedCodemodCommand):
+def _is_none(node: cst.BaseExpression) -> bool:
+    return isinstance(node, cst.Name) and node.value == "None"
+
+
+_OPTIONAL_HEADS = frozenset(("Optional",))
+_UNION_HEADS = frozenset(("Union",))
+_ANY_HEADS = frozenset(("Any",))
+
+
+def _typing_head(node: cst.BaseExpression) -> str | None:
+    """Return `name` if `node` is either `name` or `typing.name`."""
+    if isinstance(node, cst.Name):
+        return node.value
+    if isinstance(node, cst.Attribute) and isinstance(node.value, cst.Name) and node.value.value == "typing":
+        return node.attr.value
+    return None
+
+
+def _is_optional_annotation(annotation: cst.BaseExpression) -> bool:
+    """Check if the annotation is `Optional[T]`, `Union[..., None, ...]`, `Any`, `T | None` or `None | T`."""
+    if isinstance(annotation, cst.Subscript):
+        head = _typing_head(annotation.value)
+        if head in _OPTIONAL_HEADS:
+            return True
+        if head in _UNION_HEADS:
+            return any(
+                isinstance(element.slice, cst.Index) and _is_none(element.slice.value) for element in annotation.slice
+            )
+        return False
+    # TODO: This can be recursive. Can it?
+    if isinstance(annotation, cst.BinaryOperation):
+        return isinstance(annotation.operator, cst.BitOr) and (_is_none(annotation.left) or _is_none(annotation.right))
+    return _typing_head(annotation) in _ANY_HEADS
+
+
+def _is_field_call(node: cst.BaseExpression | None) -> TypeGuard[cst.Call]:
+    return isinstance(node, cst.Call) and isinstance(node.func, cst.Name) and node.func.value == "Field"
+
+
+_FIELD_DEFAULT_KWS = frozenset(("default", "default_factory"))
+
+
+class _FieldValue(Enum):
+    NO_VALUE = "no_value"
+    """The field has no assigned value e.g. `a: int`."""
+    NO_FIELD = "no_field"
+    """The value is not a `Field` call e.g. `a: int = 1`."""
+    FIELD_HAS_DEFAULT = "field_has_default"
+    """`Field` has a positional default, or a `default`/`default_factory` keyword argument."""
+    FIELD_NEEDS_NONE = "field_needs_none"
+    """`Field` has arguments, but none of them is a default."""
+    FIELD_EMPTY = "field_empty"
+    """`Field` is called without any arguments e.g. `Field()`."""
+
+
+def _classify_field_value(value: cst.BaseExpression | None) -> _FieldValue:
+    if value is None:
+        return _FieldValue.NO_VALUE
+    if not _is_field_call(value):
+        return _FieldValue.NO_FIELD
+
+    args = value.args
+    if not args:
+        return _FieldValue.FIELD_EMPTY
+    # NOTE: It has a "default" value as positional argument.
+    if args[0].keyword is None:
+        return _FieldValue.FIELD_HAS_DEFAULT
+    # NOTE: It has a "default" or "default_factory" keyword argument.
+    for arg in args:
+        if arg.keyword is not None and arg.keyword.value in _FIELD_DEFAULT_KWS:
+            return _FieldValue.FIELD_HAS_DEFAULT
+    return _FieldValue.FIELD_NEEDS_NONE
+
+
+# Values that are a default by themselves, so the annotation becomes `Optional`.
+_DEFAULT_FIELD_VALUES = frozenset((_FieldValue.NO_FIELD, _FieldValue.FIELD_HAS_DEFAULT))
+# `Field` calls without a default, which get `None` as their first argument.
+_NO_DEFAULT_FIELD_VALUES = frozenset((_FieldValue.FIELD_NEEDS_NONE, _FieldValue.FIELD_EMPTY))
+
+
+def _inject_none_default(call: cst.Call) -> cst.Call:
+    """Add `None` as the first positional argument of a `Field` call e.g. `Field(lt=10)` -> `Field(None, lt=10)`."""
+    return call.with_changes(args=(cst.Arg(value=cst.Name("None")),) + tuple(call.args))
+
+
+class AddDefaultNoneCommand(BaseCodemodCommand):
     """This codemod adds the default value `None` to all fields of a pydantic model that
     are either type `Optional[T]`, `Union[T, None]` or `Any`.
 
@@ -34,6 +123,8 @@ class AddDefaultNoneCommand(VisitorBasedCodemodCommand):
         ```
     """
 
+    __slots__ = ("inside_base_model", "should_add_none", "_base_models")
+
     METADATA_DEPENDENCIES = (FullyQualifiedNameProvider,)
 
     def __init__(self, context: CodemodContext) -> None:
@@ -41,6 +132,7 @@ class AddDefaultNoneCommand(VisitorBasedCodemodCommand):
 
         self.inside_base_model = False
         self.should_add_none = False
+        self._base_models: Collection[str] = context.scratch.setdefault(ClassDefVisitor.BASE_MODEL_CONTEXT_KEY, set())
 
     def visit_ClassDef(self, node: cst.ClassDef) -> None:
         fqn_set = self.get_metadata(FullyQualifiedNameProvider, node)
@@ -49,7 +141,7 @@ class AddDefaultNoneCommand(VisitorBasedCodemodCommand):
             return None
 
         fqn: QualifiedName = next(iter(fqn_set))  # type: ignore
-        if fqn.name in self.context.scratch[ClassDefVisitor.BASE_MODEL_CONTEXT_KEY]:
+        if ClassDefVisitor.get_classname(fqn) in self._base_models:
             self.inside_base_model = True
 
     def leave_ClassDef(self, original_node: cst.ClassDef, updated_node: cst.ClassDef) -> cst.ClassDef:
@@ -57,86 +149,38 @@ class AddDefaultNoneCommand(VisitorBasedCodemodCommand):
         return updated_node
 
     def visit_AnnAssign(self, node: cst.AnnAssign) -> None:
-        if m.matches(
-            node.annotation.annotation,
-            m.Subscript(m.Name("Optional") | m.Attribute(m.Name("typing"), m.Name("Optional")))
-            | m.Subscript(
-                m.Name("Union") | m.Attribute(m.Name("typing"), m.Name("Union")),
-                slice=[
-                    m.ZeroOrMore(),
-                    m.SubscriptElement(slice=m.Index(m.Name("None"))),
-                    m.ZeroOrMore(),
-                ],
-            )
-            | m.Name("Any")
-            | m.Attribute(m.Name("typing"), m.Name("Any"))
-            # TODO: This can be recursive. Can it?
-            | m.BinaryOperation(operator=m.BitOr(), left=m.Name("None"))
-            | m.BinaryOperation(operator=m.BitOr(), right=m.Name("None")),
-        ):
+        if not self.inside_base_model:
+            return None
+        if _is_optional_annotation(node.annotation.annotation):
             self.should_add_none = True
         return None
 
     # add optional if the assignment has a default value
-    def _handle_leave_AnnAssign_add_optional_for_default(self, original_node: cst.AnnAssign, updated_node: cst.AnnAssign) -> cst.AnnAssign:
-        if not self.inside_base_model or self.should_add_none:
-            return updated_node
-
-        if updated_node.value is None:
+    def _handle_leave_AnnAssign_add_optional_for_default(
+        self, updated_node: cst.AnnAssign, field_value: _FieldValue
+    ) -> cst.AnnAssign:
+        if field_value not in _DEFAULT_FIELD_VALUES:
             return updated_node
 
         new_annotation = cst.Subscript(
             value=cst.Name("Optional"),
             slice=[cst.SubscriptElement(cst.Index(updated_node.annotation.annotation))]
         )
-
-        if m.matches(updated_node.value, m.Call(func=m.Name("Field"))):
-            args = updated_node.value.args
-
-            if args:
-                if args[0].keyword is None:
-                    updated_node = updated_node.with_changes(
-                        annotation=updated_node.annotation.with_changes(annotation=new_annotation))
-                elif any(arg.keyword and arg.keyword.value in ("default", "default_factory") for arg in args):
-                    updated_node = updated_node.with_changes(
-                        annotation=updated_node.annotation.with_changes(annotation=new_annotation))
-
-            return updated_node
-
-        updated_node = updated_node.with_changes(
-            annotation=updated_node.annotation.with_changes(annotation=new_annotation))
-
-        return updated_node
-
+        return updated_node.with_changes(annotation=updated_node.annotation.with_changes(annotation=new_annotation))
 
     def leave_AnnAssign(self, original_node: cst.AnnAssign, updated_node: cst.AnnAssign) -> cst.AnnAssign:
-        if self.inside_base_model and self.should_add_none:
-            if updated_node.value is None:
+        # NOTE: Outside a pydantic model there's nothing to change, so the node is returned as is.
+        if self.inside_base_model:
+            field_value = _classify_field_value(updated_node.value)
+
+            if not self.should_add_none:
+                updated_node = self._handle_leave_AnnAssign_add_optional_for_default(updated_node, field_value)
+            elif field_value is _FieldValue.NO_VALUE:
                 updated_node = updated_node.with_changes(value=cst.Name("None"))
-            elif m.matches(updated_node.value, m.Call(func=m.Name("Field"))):
-                assert isinstance(updated_node.value, cst.Call)
-                args = updated_node.value.args
-                if args:
-                    # NOTE: It has a "default" value as positional argument. Nothing to do.
-                    if args[0].keyword is None:
-                        ...
-                    # NOTE: It has a "default" or "default_factory" keyword argument. Nothing to do.
-                    elif any(arg.keyword and arg.keyword.value in ("default", "default_factory") for arg in args):
-                        ...
-                    else:
-                        updated_node = updated_node.with_changes(
-                            value=updated_node.value.with_changes(args=[cst.Arg(value=cst.Name("None")), *args])
-                        )
-
-                # NOTE: This is the case where `Field` is called without any arguments e.g. `Field()`.
-                else:
-                    updated_node = updated_node.with_changes(
-                        value=updated_node.value.with_changes(args=[cst.Arg(value=cst.Name("None"))])  # type: ignore
-                    )
-
-        updated_node = self._handle_leave_AnnAssign_add_optional_for_default(original_node, updated_node)
-
-        self.inside_an_assign = False
+            elif field_value in _NO_DEFAULT_FIELD_VALUES:
+                call = cast(cst.Call, updated_node.value)
+                updated_node = updated_node.with_changes(value=_inject_none_default(call))
+
         self.should_add_none = False
         return updated_node
 
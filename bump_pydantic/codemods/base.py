@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import replace
+from typing import Generator
+
+import libcst as cst
+from libcst import MetadataWrapper
+from libcst.codemod import VisitorBasedCodemodCommand
+
+
+class BaseCodemodCommand(VisitorBasedCodemodCommand):
+    """A `VisitorBasedCodemodCommand` that resolves metadata without copying the module.
+
+    libcst deep copies the whole module before resolving its metadata, to make sure that no node
+    is shared between two places in the tree. The modules given to our commands come straight from
+    the parser, so the copy is skipped. Only use it for commands that read metadata while visiting
+    the nodes, and never on a tree where the same node instance is used twice.
+    """
+
+    @contextmanager
+    def _handle_metadata_reference(self, module: cst.Module) -> Generator[cst.Module, None, None]:
+        oldwrapper = self.context.wrapper
+        metadata_manager = self.context.metadata_manager
+        filename = self.context.filename
+        if metadata_manager is not None and filename:
+            cache = metadata_manager.get_cache_for_path(filename)
+            wrapper = MetadataWrapper(module, unsafe_skip_copy=True, cache=cache)
+        else:
+            wrapper = MetadataWrapper(module, unsafe_skip_copy=True)
+
+        with self.resolve(wrapper):
+            self.context = replace(self.context, wrapper=wrapper)
+            try:
+                yield wrapper.module
+            finally:
+                self.context = replace(self.context, wrapper=oldwrapper)
@@ -2,6 +2,7 @@
 There are two objects in the visitor:
 1. `base_model_cls` (Set[str]): Set of classes that are BaseModel based.
 2. `cls` (Dict[str, Set[str]]): A dictionary mapping each class definition to a set of base classes.
+3. `cls_bases` (Dict[str, List[List[str]]]): The bases of each class in `cls` that is not solved yet.
 
 `base_model_cls` accumulates on each iteration.
 `cls` also accumulates on each iteration, but it's also partially solved:
@@ -12,26 +13,35 @@ There are two objects in the visitor:
 
 from __future__ import annotations
 
-from collections import defaultdict
-from typing import Set, cast
+import sys
+from typing import Collection
 
 import libcst as cst
-from libcst.codemod import CodemodContext, VisitorBasedCodemodCommand
+from libcst.codemod import CodemodContext
 from libcst.metadata import FullyQualifiedNameProvider, QualifiedName
 
+from bump_pydantic.codemods.base import BaseCodemodCommand
+
+# Some fully qualified names are relative to the `src` folder e.g. `...src.module.Model`.
+_SRC_PREFIX = "...src."
+
+
+class ClassDefVisitor(BaseCodemodCommand):
+    __slots__ = ("module_fqn", "_fqn_cache", "_base", "_no_base", "_cls", "_cls_bases")
 
-class ClassDefVisitor(VisitorBasedCodemodCommand):
     METADATA_DEPENDENCIES = {FullyQualifiedNameProvider}
 
     BASE_MODEL_CONTEXT_KEY = "base_model_cls"
     NO_BASE_MODEL_CONTEXT_KEY = "no_base_model_cls"
     CLS_CONTEXT_KEY = "cls"
+    CLS_BASES_CONTEXT_KEY = "cls_bases"
 
     def __init__(self, context: CodemodContext) -> None:
         super().__init__(context)
         self.module_fqn: None | QualifiedName = None
+        self._fqn_cache: dict[cst.CSTNode, Collection[QualifiedName]] = {}
 
-        self.context.scratch.setdefault(
+        self._base: set[str] = self.context.scratch.setdefault(
             self.BASE_MODEL_CONTEXT_KEY,
             {
                 "pydantic.BaseModel", "pydantic.main.BaseModel",
@@ -40,79 +50,116 @@ class ClassDefVisitor(VisitorBasedCodemodCommand):
                 "libutil.util.CamelCaseBaseModel", "libutil.CamelCaseBaseModel",
             },
         )
-        self.context.scratch.setdefault(self.NO_BASE_MODEL_CONTEXT_KEY, set())
-        self.context.scratch.setdefault(self.CLS_CONTEXT_KEY, defaultdict(set))
-
-    def _recursively_disambiguate(self, classname: str, context_set: set[str]) -> None:
-        if classname in context_set and classname in self.context.scratch[self.CLS_CONTEXT_KEY]:
-            for child_classname in self.context.scratch[self.CLS_CONTEXT_KEY].pop(classname):
-                context_set.add(child_classname)
-                context_set.add(f"...src.{child_classname}")
-
-                self._recursively_disambiguate(child_classname, context_set)
-
-    def get_classname(self, fqn: QualifiedName):
-        return fqn.name.replace("...src.", "")
-
+        self._no_base: set[str] = self.context.scratch.setdefault(self.NO_BASE_MODEL_CONTEXT_KEY, set())
+        self._cls: dict[str, set[str]] = self.context.scratch.setdefault(self.CLS_CONTEXT_KEY, {})
+        self._cls_bases: dict[str, list[list[str]]] = self.context.scratch.setdefault(self.CLS_BASES_CONTEXT_KEY, {})
+
+    def _has_no_base_model(self, bases: list[list[str]]) -> bool:
+        """Check if each base, given as its possible classnames, is known to NOT be a `BaseModel`."""
+        return all(any(base_classname in self._no_base for base_classname in base) for base in bases)
+
+    def _disambiguate_base_models(self, classname: str) -> None:
+        # NOTE: Being a `BaseModel` is final, so the children waiting on it are consumed.
+        stack = [classname]
+        while stack:
+            child_classnames = self._cls.pop(stack.pop(), None)
+            if child_classnames is not None:
+                self._base.update(child_classnames)
+                stack.extend(child_classnames)
+                for child_classname in child_classnames:
+                    self._cls_bases.pop(child_classname, None)
+
+    def _disambiguate_no_base_models(self, classname: str) -> None:
+        # NOTE: The children waiting on it are kept, as another of their bases may still be a `BaseModel`.
+        # A child is only solved once all of its bases are known to NOT be a `BaseModel`.
+        stack = [classname]
+        while stack:
+            for child_classname in self._cls.get(stack.pop(), ()):
+                if child_classname in self._base or child_classname in self._no_base:
+                    continue
+                bases = self._cls_bases.get(child_classname)
+                if bases is not None and self._has_no_base_model(bases):
+                    del self._cls_bases[child_classname]
+                    self._no_base.add(child_classname)
+                    stack.append(child_classname)
+
+    def _fqns(self, node: cst.CSTNode) -> Collection[QualifiedName]:
+        try:
+            return self._fqn_cache[node]
+        except KeyError:
+            fqn_set = self.get_metadata(FullyQualifiedNameProvider, node)
+            fqns = self._fqn_cache[node] = fqn_set or set()  # type: ignore
+            return fqns
+
+    @staticmethod
+    def get_classname(fqn: QualifiedName) -> str:
+        # NOTE: The same classnames are looked up over and over, and interned strings compare by identity.
+        name = fqn.name
+        return sys.intern(name[len(_SRC_PREFIX) :] if name.startswith(_SRC_PREFIX) else name)
+
+    def visit_Module(self, node: cst.Module) -> None:
+        # NOTE: The cache is only valid for the tree being visited.
+        self._fqn_cache = {}
 
     def visit_ClassDef(self, node: cst.ClassDef) -> None:
-        fqn_set = self.get_metadata(FullyQualifiedNameProvider, node)
+        fqn = next(iter(self._fqns(node)), None)
 
-        if not fqn_set:
+        if fqn is None:
             return None
 
-        fqn: QualifiedName = next(iter(fqn_set))  # type: ignore
         classname = self.get_classname(fqn)
+        base_set = self._base
+        no_base_set = self._no_base
 
-        if not node.bases:
-            self.context.scratch[self.NO_BASE_MODEL_CONTEXT_KEY].add(classname)
+        # NOTE: The classification is final, and its children were already disambiguated with it.
+        if classname in base_set or classname in no_base_set:
+            return None
 
+        # A single `BaseModel` base is enough to classify the class, but it's only known to NOT be a
+        # `BaseModel` once all of its bases are known to not be one.
+        bases: list[list[str]] = []
         for arg in node.bases:
-            base_fqn_set = self.get_metadata(FullyQualifiedNameProvider, arg.value)
-            base_fqn_set = base_fqn_set or set()
-
-            for base_fqn in cast(Set[QualifiedName], iter(base_fqn_set)):  # type: ignore
-                base_classname = self.get_classname(base_fqn)
-
-                if base_classname in self.context.scratch[self.BASE_MODEL_CONTEXT_KEY]:
-                    self.context.scratch[self.BASE_MODEL_CONTEXT_KEY].add(classname)
-                    self.context.scratch[self.BASE_MODEL_CONTEXT_KEY].add(f"...src.{classname}")
-                elif base_classname in self.context.scratch[self.NO_BASE_MODEL_CONTEXT_KEY]:
-                    self.context.scratch[self.NO_BASE_MODEL_CONTEXT_KEY].add(classname)
-                    self.context.scratch[self.NO_BASE_MODEL_CONTEXT_KEY].add(f"...src.{classname}")
-
-
-            # In case we have the following scenario:
-            # class ChildA(A):
-            # class A(B): ...
-            # class B(BaseModel): ...
-            # class D(C): ...
-            # class C: ...
-            # We want to disambiguate `A` and then `ChildA` as soon as we see `B` is a `BaseModel`.
-            # We recursively add child classes to self.BASE_MODEL_CONTEXT_KEY.
-            self._recursively_disambiguate(classname, self.context.scratch[self.BASE_MODEL_CONTEXT_KEY])
-
-            # In case we have the following scenario:
-            # class A(B): ...
-            # class B(BaseModel): ...
-            # class E(D): ...
-            # class D(C): ...
-            # class C: ...
-            # We want to disambiguate `D` and then `E` as soon as we see `C` is NOT a `BaseModel`.
-            # We recursively add child classes to self.NO_BASE_MODEL_CONTEXT_KEY.
-            self._recursively_disambiguate(classname, self.context.scratch[self.NO_BASE_MODEL_CONTEXT_KEY])
-
-            # In case we have the following scenario:
-            # class A(B): ...
-            # ...And B is not known.
-            # We want to make sure that B -> A is added to the `cls` context, so if we find B later,
-            # we can disambiguate.
-            if classname not in (
-                *self.context.scratch[self.BASE_MODEL_CONTEXT_KEY],
-                *self.context.scratch[self.NO_BASE_MODEL_CONTEXT_KEY],
-            ):
-                for base_fqn in cast(Set[QualifiedName], base_fqn_set):
-                    self.context.scratch[self.CLS_CONTEXT_KEY][self.get_classname(base_fqn)].add(classname)
+            base_classnames = [self.get_classname(base_fqn) for base_fqn in self._fqns(arg.value)]
+            if any(base_classname in base_set for base_classname in base_classnames):
+                base_set.add(classname)
+                break
+            bases.append(base_classnames)
+        else:
+            if self._has_no_base_model(bases):
+                no_base_set.add(classname)
+
+        # In case we have the following scenario:
+        # class ChildA(A):
+        # class A(B): ...
+        # class B(BaseModel): ...
+        # class D(C): ...
+        # class C: ...
+        # We want to disambiguate `A` and then `ChildA` as soon as we see `B` is a `BaseModel`.
+        # We iteratively add child classes to self.BASE_MODEL_CONTEXT_KEY.
+        if classname in base_set:
+            self._disambiguate_base_models(classname)
+
+        # In case we have the following scenario:
+        # class A(B): ...
+        # class B(BaseModel): ...
+        # class E(D): ...
+        # class D(C): ...
+        # class C: ...
+        # We want to disambiguate `D` and then `E` as soon as we see `C` is NOT a `BaseModel`.
+        # We iteratively add child classes to self.NO_BASE_MODEL_CONTEXT_KEY.
+        if classname in no_base_set:
+            self._disambiguate_no_base_models(classname)
+
+        # In case we have the following scenario:
+        # class A(B): ...
+        # ...And B is not known.
+        # We want to make sure that B -> A is added to the `cls` context, so if we find B later,
+        # we can disambiguate.
+        if classname not in base_set and classname not in no_base_set:
+            for base_classnames in bases:
+                for base_classname in base_classnames:
+                    self._cls.setdefault(base_classname, set()).add(classname)
+            self._cls_bases[classname] = bases
 
     # TODO: Implement this if needed...
     def next_file(self, visited: set[str]) -> str | None:
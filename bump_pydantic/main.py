@@ -7,7 +7,7 @@ import time
 import traceback
 from collections import deque
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Set, Tuple, Type, TypeVar, Union
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple, Type, TypeVar, Union
 
 import libcst as cst
 from libcst.codemod import CodemodContext, ContextAwareTransformer
@@ -122,18 +122,26 @@ def main(
             if next_file is not None:
                 queue.appendleft(next_file)
 
+    # The class hierarchy is fully resolved at this point, and the codemods only read the base models.
+    base_models = frozenset(scratch[ClassDefVisitor.BASE_MODEL_CONTEXT_KEY])
+    codemod_scratch: Dict[str, Any] = {ClassDefVisitor.BASE_MODEL_CONTEXT_KEY: base_models}
+
     start_time = time.time()
 
     codemods = gather_codemods(disabled=disable)
 
     log_fp = log_file.open("a+", encoding="utf8")
-    partial_run_codemods = functools.partial(run_codemods, codemods, metadata_manager, scratch, package, diff)
     with Progress(*Progress.get_default_columns(), transient=True) as progress:
         task = progress.add_task(description="Executing codemods...", total=len(files))
         count_errors = 0
         difflines: List[List[str]] = []
-        with multiprocessing.Pool(processes=processes) as pool:
-            for error, _difflines in pool.imap_unordered(partial_run_codemods, files):
+        # NOTE: The shared state is sent once per worker, instead of being pickled along with every file.
+        with multiprocessing.Pool(
+            processes=processes,
+            initializer=init_worker,
+            initargs=(codemods, metadata_manager, codemod_scratch, package, diff),
+        ) as pool:
+            for error, _difflines in pool.imap_unordered(run_worker_codemods, files):
                 progress.advance(task)
 
                 if _difflines is not None:
@@ -163,6 +171,25 @@ def main(
         raise Exit(1)
 
 
+_worker_run_codemods: Union[Callable[[str], Tuple[Union[str, None], Union[List[str], None]]], None] = None
+
+
+def init_worker(
+    codemods: List[Type[ContextAwareTransformer]],
+    metadata_manager: FullRepoManager,
+    scratch: Dict[str, Any],
+    package: Path,
+    diff: bool,
+) -> None:
+    global _worker_run_codemods
+    _worker_run_codemods = functools.partial(run_codemods, codemods, metadata_manager, scratch, package, diff)
+
+
+def run_worker_codemods(filename: str) -> Tuple[Union[str, None], Union[List[str], None]]:
+    assert _worker_run_codemods is not None, "init_worker() must run before run_worker_codemods()"
+    return _worker_run_codemods(filename)
+
+
 def run_codemods(
     codemods: List[Type[ContextAwareTransformer]],
     metadata_manager: FullRepoManager,
@@ -103,6 +103,32 @@ class TestAddAnnotationsCommand(UnitTest):
         ).lstrip()
         assert module.code == expected
 
+    def test_with_src_prefixed_module(self) -> None:
+        source = textwrap.dedent(
+            """
+            from pydantic import BaseModel
+
+            class Foo(BaseModel):
+                a = 1
+
+            class Bar(Foo):
+                b = 1
+            """
+        ).lstrip()
+        module = self.add_annotations("...src/module.py", source)
+        expected = textwrap.dedent(
+            """
+            from pydantic import BaseModel
+
+            class Foo(BaseModel):
+                a: int = 1
+
+            class Bar(Foo):
+                b: int = 1
+            """
+        ).lstrip()
+        assert module.code == expected
+
     def test_with_multiple_classes(self) -> None:
         source = textwrap.dedent(
             """
@@ -127,6 +127,66 @@ class Potato(BaseModel):
         )
         assert module.code == expected
 
+    def test_typing_attribute_and_bitor_none(self) -> None:
+        module = self.add_default_none(
+            "some/test/module.py",
+            """
+            import typing
+            from pydantic import BaseModel
+
+            class Potato(BaseModel):
+                a: typing.Optional[str]
+                b: typing.Union[str, None]
+                c: typing.Any
+                d: str | None
+                e: None | str
+            """,
+        )
+        expected = textwrap.dedent(
+            """import typing
+from pydantic import BaseModel
+
+class Potato(BaseModel):
+    a: typing.Optional[str] = None
+    b: typing.Union[str, None] = None
+    c: typing.Any = None
+    d: str | None = None
+    e: None | str = None
+"""
+        )
+        assert module.code == expected
+
+    def test_field_defaults(self) -> None:
+        module = self.add_default_none(
+            "some/test/module.py",
+            """
+            from pydantic import BaseModel, Field
+            from typing import Optional
+
+            class Potato(BaseModel):
+                a: Optional[int] = Field()
+                b: Optional[int] = Field(lt=10)
+                c: Optional[int] = Field(lt=10, default=1)
+                d: int = Field(lt=10)
+                e: int = Field(default_factory=int)
+                f: int = 1
+            """,
+        )
+        expected = textwrap.dedent(
+            """from pydantic import BaseModel, Field
+from typing import Optional
+
+class Potato(BaseModel):
+    a: Optional[int] = Field(None)
+    b: Optional[int] = Field(None, lt=10)
+    c: Optional[int] = Field(lt=10, default=1)
+    d: int = Field(lt=10)
+    e: Optional[int] = Field(default_factory=int)
+    f: Optional[int] = 1
+"""
+        )
+        assert module.code == expected
+
     @pytest.mark.xfail(reason="Recursive Union is not supported")
     def test_union_of_union(self) -> None:
         module = self.add_default_none(
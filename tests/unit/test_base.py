@@ -0,0 +1,18 @@
+import libcst as cst
+from libcst.codemod import CodemodContext
+
+from bump_pydantic.codemods.base import BaseCodemodCommand
+
+
+class RecordModuleCommand(BaseCodemodCommand):
+    def visit_Module(self, node: cst.Module) -> None:
+        self.visited = node
+
+
+def test_metadata_reference_does_not_copy_module() -> None:
+    module = cst.parse_module("class Foo:\n    a: int\n")
+    command = RecordModuleCommand(CodemodContext())
+
+    command.transform_module(module)
+
+    assert command.visited is module
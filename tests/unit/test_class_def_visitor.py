@@ -1,75 +1,162 @@
-# from pathlib import Path
-
-# from libcst import MetadataWrapper, parse_module
-# from libcst.codemod import CodemodContext, CodemodTest
-# from libcst.metadata import FullyQualifiedNameProvider
-# from libcst.testing.utils import UnitTest
-
-
-# class TestClassDefVisitor(UnitTest):
-#     def gather_class_def(self, file_path: str, code: str) -> ClassDefVisitor:
-#         mod = MetadataWrapper(
-#             parse_module(CodemodTest.make_fixture_data(code)),
-#             cache={
-#                 FullyQualifiedNameProvider: FullyQualifiedNameProvider.gen_cache(Path(""), [file_path], None).get(
-#                     file_path, ""
-#                 )
-#             },
-#         )
-#         mod.resolve_many(ClassDefVisitor.METADATA_DEPENDENCIES)
-#         instance = ClassDefVisitor(CodemodContext(wrapper=mod))
-#         mod.visit(instance)
-#         return instance
-
-#     def test_no_annotations(self) -> None:
-#         visitor = self.gather_class_def(
-#             "some/test/module.py",
-#             """
-#             def foo() -> None:
-#                 pass
-#             """,
-#         )
-#         results = visitor.context.scratch[ClassDefVisitor.BASE_MODEL_CONTEXT_KEY]
-#         self.assertEqual(results, {"pydantic.BaseModel", "pydantic.main.BaseModel"})
-
-#     def test_without_bases(self) -> None:
-#         visitor = self.gather_class_def(
-#             "some/test/module.py",
-#             """
-#             class Foo:
-#                 pass
-#             """,
-#         )
-#         results = visitor.context.scratch[ClassDefVisitor.BASE_MODEL_CONTEXT_KEY]
-#         self.assertEqual(results, {"pydantic.BaseModel", "pydantic.main.BaseModel"})
-
-#     def test_with_class_defs(self) -> None:
-#         visitor = self.gather_class_def(
-#             "some/test/module.py",
-#             """
-#             from pydantic import BaseModel
-
-#             class Foo(BaseModel):
-#                 pass
-
-#             class Bar(Foo):
-#                 pass
-#             """,
-#         )
-#         results = visitor.context.scratch[ClassDefVisitor.BASE_MODEL_CONTEXT_KEY]
-#         self.assertEqual(
-#             results, {"pydantic.BaseModel", "pydantic.main.BaseModel", "some.test.module.Foo", "some.test.module.Bar"}
-#         )
-
-#     def test_with_pydantic_base_model(self) -> None:
-#         visitor = self.gather_class_def(
-#             "some/test/module.py",
-#             """
-#             import pydantic
-
-#             class Foo(pydantic.BaseModel):
-#                 ...
-#             """,
-#         )
-#         results = visitor.context.scratch[ClassDefVisitor.BASE_MODEL_CONTEXT_KEY]
-#         self.assertEqual(results, {"pydantic.BaseModel", "pydantic.main.BaseModel", "some.test.module.Foo"})
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Any
+
+from libcst import MetadataWrapper, parse_module
+from libcst.codemod import CodemodContext, CodemodTest
+from libcst.metadata import FullyQualifiedNameProvider
+from libcst.testing.utils import UnitTest
+
+from bump_pydantic.codemods.class_def_visitor import ClassDefVisitor
+
+
+class TestClassDefVisitor(UnitTest):
+    def gather_class_defs(self, files: dict[str, str], scratch: dict[str, Any] | None = None) -> dict[str, Any]:
+        """Visit the `files` in order, sharing the same scratch like the CLI does."""
+        scratch = {} if scratch is None else scratch
+        caches = FullyQualifiedNameProvider.gen_cache(Path(""), list(files), None)
+        for file_path, code in files.items():
+            mod = MetadataWrapper(
+                parse_module(CodemodTest.make_fixture_data(code)),
+                cache={FullyQualifiedNameProvider: caches.get(file_path, "")},
+            )
+            mod.resolve_many(ClassDefVisitor.METADATA_DEPENDENCIES)
+            mod.visit(ClassDefVisitor(CodemodContext(wrapper=mod, scratch=scratch)))
+        return scratch
+
+    def test_with_class_defs(self) -> None:
+        scratch = self.gather_class_defs(
+            {
+                "some/test/module.py": """
+                from pydantic import BaseModel
+
+                class Foo(BaseModel):
+                    pass
+
+                class Bar(Foo):
+                    pass
+
+                class Potato:
+                    pass
+
+                class Spam(Potato):
+                    pass
+                """,
+            }
+        )
+        assert {"some.test.module.Foo", "some.test.module.Bar"} <= scratch[ClassDefVisitor.BASE_MODEL_CONTEXT_KEY]
+        assert scratch[ClassDefVisitor.NO_BASE_MODEL_CONTEXT_KEY] == {
+            "some.test.module.Potato",
+            "some.test.module.Spam",
+        }
+
+    def test_child_visited_before_parent(self) -> None:
+        scratch = self.gather_class_defs(
+            {
+                "pkg/a.py": """
+                from pkg.b import B
+
+                class A(B):
+                    pass
+                """,
+                "pkg/b.py": """
+                from pydantic import BaseModel
+
+                class B(BaseModel):
+                    pass
+                """,
+            }
+        )
+        assert {"pkg.a.A", "pkg.b.B"} <= scratch[ClassDefVisitor.BASE_MODEL_CONTEXT_KEY]
+
+    def test_mixin_and_model_bases(self) -> None:
+        scratch = self.gather_class_defs(
+            {
+                "some/test/module.py": """
+                from pydantic import BaseModel
+
+                class Mixin:
+                    pass
+
+                class Model(BaseModel):
+                    pass
+
+                class A(Mixin, Model):
+                    pass
+
+                class B(Mixin):
+                    pass
+                """,
+            }
+        )
+        assert "some.test.module.A" in scratch[ClassDefVisitor.BASE_MODEL_CONTEXT_KEY]
+        assert "some.test.module.B" in scratch[ClassDefVisitor.NO_BASE_MODEL_CONTEXT_KEY]
+
+    def test_mixin_resolved_before_model(self) -> None:
+        scratch = self.gather_class_defs(
+            {
+                "pkg/a.py": """
+                from pkg.mixin import Mixin
+                from pkg.model import Model
+
+                class A(Mixin, Model):
+                    pass
+                """,
+                "pkg/d.py": """
+                from pkg.a import A
+
+                class D(A):
+                    pass
+                """,
+                "pkg/mixin.py": """
+                class Mixin:
+                    pass
+                """,
+                "pkg/model.py": """
+                from pydantic import BaseModel
+
+                class Model(BaseModel):
+                    pass
+                """,
+            }
+        )
+        assert {"pkg.a.A", "pkg.d.D", "pkg.model.Model"} <= scratch[ClassDefVisitor.BASE_MODEL_CONTEXT_KEY]
+        assert scratch[ClassDefVisitor.NO_BASE_MODEL_CONTEXT_KEY] == {"pkg.mixin.Mixin"}
+
+    def test_child_of_mixins_visited_before_them(self) -> None:
+        files = {
+            "pkg/a.py": """
+            from pkg.mixins import Bar, Foo
+
+            class A(Foo, Bar):
+                pass
+            """,
+            "pkg/b.py": """
+            from pkg.a import A
+
+            class B(A):
+                pass
+            """,
+        }
+        scratch = self.gather_class_defs(files)
+        self.gather_class_defs({"pkg/mixins.py": "class Foo:\n    pass\n"}, scratch)
+        assert not {"pkg.a.A", "pkg.b.B"} & scratch[ClassDefVisitor.NO_BASE_MODEL_CONTEXT_KEY]
+
+        self.gather_class_defs({"pkg/mixins.py": "class Bar:\n    pass\n"}, scratch)
+        assert {"pkg.a.A", "pkg.b.B"} <= scratch[ClassDefVisitor.NO_BASE_MODEL_CONTEXT_KEY]
+        assert not scratch[ClassDefVisitor.CLS_BASES_CONTEXT_KEY]
+
+    def test_already_classified_class_is_skipped(self) -> None:
+        scratch = self.gather_class_defs(
+            {
+                "some/test/module.py": """
+                from pydantic import BaseModel
+
+                class Foo(BaseModel):
+                    pass
+                """,
+            },
+            scratch={ClassDefVisitor.NO_BASE_MODEL_CONTEXT_KEY: {"some.test.module.Foo"}},
+        )
+        assert "some.test.module.Foo" not in scratch[ClassDefVisitor.BASE_MODEL_CONTEXT_KEY]